@@ -0,0 +1,82 @@
+"""Micro-benchmark for rendering the message and user info embeds
+
+Run with `python benchmarks/bench_embeds.py` after `pip install -e .`
+
+"""
+import timeit
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from types import SimpleNamespace
+
+import discord
+
+from discord_mod_utils.manager import ModerationManager
+
+ROLES = 250
+NUMBER = 2000
+
+
+class StubMember(discord.Member):
+    """A member with many roles that doesn't need a connection"""
+
+    id = 0
+    name = "member"
+    discriminator = "0000"
+    display_name = "member"
+    mention = "<@0>"
+    avatar = None
+    roles = None
+    guild_permissions = None
+    joined_at = None
+    created_at = None
+
+    def __init__(self, roles: int) -> None:
+        now = datetime.now(timezone.utc)
+        self.roles = [SimpleNamespace(mention=f"<@&{role}>") for role in range(roles)]
+        self.guild_permissions = discord.Permissions(0b1010_1010_1010_1010_1010)
+        self.created_at = now - timedelta(days=400)
+        self.joined_at = now - timedelta(hours=5)
+
+
+class StubChannel(discord.TextChannel):
+    """A text channel that doesn't need a connection"""
+
+    mention = "<#0>"
+
+    def __init__(self) -> None:
+        pass
+
+    def permissions_for(self, obj) -> discord.Permissions:
+        return discord.Permissions(0b1111_0000_1111_0000)
+
+
+def main() -> None:
+    """Time both embeds and print the cost of a single render"""
+    manager = ModerationManager(None, None)  # type: ignore
+    member = StubMember(ROLES)
+    channel = StubChannel()
+    message = SimpleNamespace(
+        jump_url="https://discord.com/channels/0/0/0",
+        author=member,
+        created_at=datetime.now(timezone.utc) - timedelta(minutes=3),
+        edited_at=datetime.now(timezone.utc) - timedelta(minutes=1),
+        channel=channel,
+    )
+    benchmarks = {
+        "form_user_info_embed": lambda: manager.form_user_info_embed(member, channel),
+        "form_user_info_embed (short)": lambda: manager.form_user_info_embed(
+            member, channel, True
+        ),
+        "form_message_info_embed": lambda: manager.form_message_info_embed(
+            message, member  # type: ignore
+        ),
+    }
+    print(f"{ROLES} roles, best of 5 x {NUMBER} renders")
+    for name, render in benchmarks.items():
+        best = min(timeit.repeat(render, number=NUMBER, repeat=5))
+        print(f"{name:30} {best / NUMBER * 1e6:8.1f} us")
+
+
+if __name__ == "__main__":
+    main()
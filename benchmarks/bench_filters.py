@@ -0,0 +1,41 @@
+"""Micro-benchmark for scanning messages with a compiled keyword filter
+
+Shows that the scan cost stays flat as the word list grows.
+Run with `python benchmarks/bench_filters.py` after `pip install -e .`
+
+"""
+import random
+import string
+import timeit
+
+from discord_mod_utils.filters import CompiledFilter
+
+SIZES = [10, 100, 1000, 5000]
+MESSAGE_LENGTH = 500
+NUMBER = 500
+
+
+def random_word(rng: random.Random) -> str:
+    """Generate a random lowercase word"""
+    return "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 10)))
+
+
+def main() -> None:
+    """Time scanning the same message with filters of growing size"""
+    rng = random.Random(0)
+    message = " ".join(
+        random_word(rng) for _ in range(MESSAGE_LENGTH // 8)
+    )[:MESSAGE_LENGTH]
+    patterns = [r"free\s+nitro", r"disc[o0]rd\.gift/\w+", r"(.)\1{5,}"]
+    print(f"{MESSAGE_LENGTH} character message, best of 5 x {NUMBER} scans")
+    for size in SIZES:
+        words = [random_word(rng) for _ in range(size)]
+        compiled = CompiledFilter(words, patterns)
+        best = min(
+            timeit.repeat(lambda: compiled.scan(message), number=NUMBER, repeat=5)
+        )
+        print(f"{size:5} words {best / NUMBER * 1e6:8.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,9 +7,16 @@ from dotenv import find_dotenv
 from dotenv import load_dotenv
 
 from .cogs.moderation import ModerationCog
+from .cogs.moderation.filters import FilterScanCog
+from .cogs.moderation.joins import JoinIndexCog
+from .cogs.moderation.spam import SpamDetectionCog
+from .cached_db import CachedDatabase
 from .config import Config
 from .firebase_db import FirestoreDatabase
 from .manager import ModerationManager
+from .profiler import InteractionProfiler
+from .profiler import enable_profiling
+from .spam import SpamDetector
 
 
 class PromptWhenNoDefault(click.Option):
@@ -55,23 +62,151 @@ load_dotenv(find_dotenv(usecwd=True))
     type=int,
     multiple=True,
 )
-def main(token, firebase_creds, debug_guild):
+@click.option(
+    "--snapshot",
+    help="file to save the guild configuration cache to on shutdown"
+    + " and load it from on start",
+    default=None,
+    type=click.Path(dir_okay=False),
+)
+@click.option(
+    "--snapshot-max-age",
+    help="seconds after which a saved snapshot is ignored",
+    default=60 * 60,
+    show_default=True,
+    type=float,
+)
+@click.option(
+    "--export-dir",
+    help="directory to save case transcripts to",
+    default="exports",
+    show_default=True,
+    type=click.Path(file_okay=False),
+)
+@click.option(
+    "--filters/--no-filters",
+    help="flag messages matching the guild keyword filters",
+    default=False,
+)
+@click.option(
+    "--join-index/--no-join-index",
+    help="index member joins for the /joins command (needs the members intent)",
+    default=False,
+)
+@click.option(
+    "--spam-detection/--no-spam-detection",
+    help="open cases for near-identical messages sent by many accounts",
+    default=False,
+)
+@click.option(
+    "--spam-window",
+    help="seconds within which repeated messages count as spam",
+    default=10.0,
+    show_default=True,
+    type=float,
+)
+@click.option(
+    "--spam-accounts",
+    help="number of accounts or channels that make repeated messages spam",
+    default=3,
+    show_default=True,
+    type=click.IntRange(2),
+)
+@click.option(
+    "--profile/--no-profile",
+    help="dump traces of slow interactions to a rotating file",
+    default=False,
+)
+@click.option(
+    "--profile-file",
+    help="file to dump slow interaction traces to",
+    default="slow_interactions.jsonl",
+    show_default=True,
+    type=click.Path(dir_okay=False),
+)
+@click.option(
+    "--profile-threshold",
+    help="duration in seconds above which an interaction is considered slow",
+    default=1.0,
+    show_default=True,
+    type=float,
+)
+@click.option(
+    "--profile-sample-rate",
+    help="fraction of the interactions to trace",
+    default=0.1,
+    show_default=True,
+    type=click.FloatRange(0, 1),
+)
+def main(
+    token,
+    firebase_creds,
+    debug_guild,
+    snapshot,
+    snapshot_max_age,
+    export_dir,
+    filters,
+    join_index,
+    spam_detection,
+    spam_window,
+    spam_accounts,
+    profile,
+    profile_file,
+    profile_threshold,
+    profile_sample_rate,
+):
     """Main function
 
     Connects to a firestore database and starts the bot
 
     """
-    database = FirestoreDatabase(firebase_creds)
-    config = Config(token=token, database=database)
+    if profile:
+        enable_profiling(
+            InteractionProfiler(
+                path=profile_file,
+                threshold=profile_threshold,
+                sample_rate=profile_sample_rate,
+            )
+        )
+    database = CachedDatabase(FirestoreDatabase(firebase_creds))
+    if snapshot:
+        loaded = database.load_snapshot(snapshot, snapshot_max_age)
+        click.echo(f"Loaded {loaded} guild configurations from the snapshot")
+    config = Config(token=token, database=database, export_dir=export_dir)
+    intents = discord.Intents.default()
+    if filters or spam_detection:
+        intents.message_content = True
+    if join_index:
+        intents.members = True
     if debug_guild:
         click.echo("You are using these guilds for debugging:")
         click.echo("    " + ",".join(f"{x}" for x in debug_guild))
         click.echo("Don't do this in production...")
-        bot = discord.Bot(debug_guilds=list(debug_guild))
+        bot = discord.Bot(debug_guilds=list(debug_guild), intents=intents)
     else:
-        bot = discord.Bot()
-    bot.add_cog(ModerationCog(ModerationManager(bot, config)))
-    bot.run(token)
+        bot = discord.Bot(intents=intents)
+    manager = ModerationManager(bot, config)
+    bot.add_cog(ModerationCog(manager))
+    if filters:
+        bot.add_cog(FilterScanCog(manager))
+    if join_index:
+        bot.add_cog(JoinIndexCog(manager))
+    if spam_detection:
+        bot.add_cog(
+            SpamDetectionCog(
+                manager,
+                SpamDetector(
+                    window=spam_window,
+                    min_accounts=spam_accounts,
+                    min_channels=spam_accounts,
+                ),
+            )
+        )
+    try:
+        bot.run(token)
+    finally:
+        if snapshot:
+            database.save_snapshot(snapshot)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,80 @@
+import json
+import os
+import time
+
+from .database import Database
+from .database import Guild
+
+
+class CachedDatabase(Database):
+    """An in-memory write-through cache in front of another database
+
+    The cache can be saved to a local snapshot on shutdown and loaded
+    back on start, so that a restarted bot doesn't have to refetch the
+    configuration of every guild. Only the guild configurations are
+    saved; webhooks are refetched since their URLs are credentials
+
+    """
+
+    def __init__(self, database: Database):
+        """Initialize the cache
+
+        Args:
+            database: the database to read from and write through to
+
+        """
+        self.database = database
+        self.guilds: dict[int, Guild] = {}
+
+    def get_guild(self, guild_id: int) -> Guild:
+        """Retrieve the configuration for a given guild"""
+        if guild_id not in self.guilds:
+            self.guilds[guild_id] = self.database.get_guild(guild_id)
+        return Guild.from_dict(self.guilds[guild_id].to_dict())
+
+    def set_guild(self, guild_id: int, guild: Guild) -> None:
+        """Save the configuration of a guild"""
+        self.database.set_guild(guild_id, guild)
+        self.guilds[guild_id] = Guild.from_dict(guild.to_dict())
+
+    def save_snapshot(self, path: str) -> None:
+        """Save the cached configurations to a local file"""
+        snapshot = {
+            "saved_at": time.time(),
+            "guilds": {
+                str(guild_id): guild.to_dict()
+                for guild_id, guild in self.guilds.items()
+            },
+        }
+        with open(f"{path}.tmp", "w", encoding="utf-8") as file:
+            json.dump(snapshot, file)
+        os.replace(f"{path}.tmp", path)
+
+    def load_snapshot(self, path: str, max_age: float) -> int:
+        """Load the cached configurations from a local file
+
+        The snapshot is removed once read, so that a bot that crashes
+        before saving a new one doesn't come back with stale data
+
+        Args:
+            path: the file the snapshot was saved to
+            max_age: snapshots older than that (in seconds) are ignored
+
+        Returns:
+            the number of guild configurations loaded
+
+        """
+        try:
+            with open(path, encoding="utf-8") as file:
+                snapshot = json.load(file)
+        except (OSError, ValueError):
+            return 0
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        if time.time() - snapshot.get("saved_at", 0) > max_age:
+            return 0
+        for guild_id, guild in snapshot.get("guilds", {}).items():
+            self.guilds.setdefault(int(guild_id), Guild.from_dict(guild))
+        return len(snapshot.get("guilds", {}))
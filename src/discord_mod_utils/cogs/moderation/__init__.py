@@ -1,8 +1,10 @@
 from .configure import ConfigurerCog
+from .export import ExportCog
+from .filters import FilterCog
 from .utils import UtilsCog
 
 
-class ModerationCog(ConfigurerCog, UtilsCog):
+class ModerationCog(ConfigurerCog, ExportCog, FilterCog, UtilsCog):
     """This just unites all cogs into one"""
 
     pass
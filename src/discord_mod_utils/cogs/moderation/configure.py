@@ -1,6 +1,7 @@
 import discord
 from discord.ext import commands
 
+from ...profiler import profiled
 from ..managed import ManagedCog
 
 
@@ -17,6 +18,7 @@ class ConfigurerCog(ManagedCog):
 
     @config.command(description="Choose a role for performing moderator actions.")
     @commands.has_permissions(administrator=True)
+    @profiled("/config moderator")
     async def moderator(self, ctx, role: discord.Role):
         """Set the moderator role"""
         guild_config = self.manager.config.database.get_guild(ctx.guild.id)
@@ -28,6 +30,7 @@ class ConfigurerCog(ManagedCog):
         description="Choose a channel to create moderation case threads in."
     )
     @commands.has_permissions(administrator=True)
+    @profiled("/config cases")
     async def cases(self, ctx, channel: discord.TextChannel):
         """Set the moderation cases channel"""
         guild_config = self.manager.config.database.get_guild(ctx.guild.id)
@@ -35,11 +38,34 @@ class ConfigurerCog(ManagedCog):
         self.manager.config.database.set_guild(ctx.guild.id, guild_config)
         await ctx.respond(f"{channel.mention} is now a moderation cases channel")
 
+    @config.command(
+        description="Choose how much of the surrounding conversation"
+        + " to copy into moderation case threads."
+    )
+    @commands.has_permissions(administrator=True)
+    @profiled("/config context")
+    async def context(
+        self,
+        ctx,
+        messages: discord.Option(int, min_value=0, max_value=100),  # type: ignore
+        reply_chain: bool = False,
+    ):
+        """Set the amount of conversation context captured into cases"""
+        guild_config = self.manager.config.database.get_guild(ctx.guild.id)
+        guild_config.context_messages = messages
+        guild_config.capture_reply_chain = reply_chain
+        self.manager.config.database.set_guild(ctx.guild.id, guild_config)
+        await ctx.respond(
+            f"Moderation cases will include {messages} preceding messages"
+            + (" and the reply chain" if reply_chain else "")
+        )
+
     @config.command(
         description="Forget about the moderation hook"
         + " (creates a new one when needed, doesn't delete the old one)"
     )
     @commands.has_permissions(administrator=True)
+    @profiled("/config reset_webhook")
     async def reset_webhook(self, ctx):
         """Reset the moderation copy webhook"""
         self.manager.config.set_mod_hook(ctx.guild.id, None)
@@ -0,0 +1,88 @@
+import discord
+from discord.ext import commands
+
+from ...guards import is_mod
+from ...profiler import profiled
+from ...transcript import WRITERS
+from ..managed import ManagedCog
+
+
+class ExportCog(ManagedCog):
+    """A class storing all case export commands"""
+
+    export = discord.SlashCommandGroup(
+        "export",
+        "Export moderation case transcripts",
+    )
+
+    @export.command(description="Export a moderation case thread.")
+    @profiled("/export case")
+    async def case(
+        self,
+        ctx,
+        format: discord.Option(str, choices=list(WRITERS)),  # type: ignore
+        thread: discord.Option(  # type: ignore
+            discord.Thread,
+            description="Defaults to the current thread",
+            required=False,
+        ) = None,
+    ):
+        """Export a single case thread and upload the transcript"""
+        member = await ctx.guild.fetch_member(ctx.user.id)
+        if not await is_mod(
+            member,
+            self.manager.config,
+            lambda response: ctx.respond(response, ephemeral=True),
+        ):
+            return
+        thread = thread or ctx.channel
+        if not isinstance(thread, discord.Thread):
+            await ctx.respond(
+                "Run this command in a case thread or choose one", ephemeral=True
+            )
+            return
+        if thread.parent_id != self.manager.config.get_mod_cases(ctx.guild.id):
+            await ctx.respond(
+                "Only threads in the moderation cases channel can be exported",
+                ephemeral=True,
+            )
+            return
+        await ctx.defer(ephemeral=True)
+        path = await self.manager.export_thread(thread, format)
+        try:
+            await ctx.followup.send(file=discord.File(path), ephemeral=True)
+        except discord.HTTPException:
+            await ctx.followup.send(
+                f"The transcript is too large to upload; it was saved to `{path}`",
+                ephemeral=True,
+            )
+
+    @export.command(description="Export all moderation case threads.")
+    @profiled("/export all")
+    async def all(
+        self,
+        ctx,
+        format: discord.Option(str, choices=list(WRITERS)),  # type: ignore
+    ):
+        """Export every case thread in the cases channel to disk"""
+        member = await ctx.guild.fetch_member(ctx.user.id)
+        if not await is_mod(
+            member,
+            self.manager.config,
+            lambda response: ctx.respond(response, ephemeral=True),
+        ):
+            return
+        thread_channel = self.manager.config.get_mod_cases(ctx.guild.id)
+        if thread_channel is None:
+            await ctx.respond(
+                "You didn't set up a moderation cases channel. "
+                + "Use `/config cases` to choose one",
+                ephemeral=True,
+            )
+            return
+        await ctx.defer(ephemeral=True)
+        exported = await self.manager.export_cases(thread_channel, format)
+        await ctx.followup.send(
+            f"Exported {exported} cases to `{self.manager.config.export_dir}`",
+            ephemeral=True,
+        )
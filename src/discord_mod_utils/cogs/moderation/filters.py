@@ -0,0 +1,129 @@
+import re
+
+import discord
+from discord.ext import commands
+
+from ...filters import has_nested_repeat
+from ...profiler import profiled
+from ..managed import ManagedCog
+
+
+class FilterCog(ManagedCog):
+    """A class storing all keyword filter configuration commands"""
+
+    filter = discord.SlashCommandGroup(
+        "filter",
+        "Configure the words and patterns that get flagged",
+    )
+
+    @filter.command(description="Flag messages containing a whole word or phrase.")
+    @commands.has_permissions(administrator=True)
+    @profiled("/filter add_word")
+    async def add_word(self, ctx, word: str):
+        """Add a literal term to the filter"""
+        compiled = self.manager.get_filter(ctx.guild.id)
+        word = word.lower()
+        if word in compiled.words:
+            await ctx.respond(f"`{word}` is already filtered")
+            return
+        self.manager.set_filter(
+            ctx.guild.id, [*compiled.words, word], list(compiled.patterns)
+        )
+        await ctx.respond(f"`{word}` is now filtered")
+
+    @filter.command(description="Stop flagging messages containing a word.")
+    @commands.has_permissions(administrator=True)
+    @profiled("/filter remove_word")
+    async def remove_word(self, ctx, word: str):
+        """Remove a literal term from the filter"""
+        compiled = self.manager.get_filter(ctx.guild.id)
+        word = word.lower()
+        if word not in compiled.words:
+            await ctx.respond(f"`{word}` isn't filtered")
+            return
+        self.manager.set_filter(
+            ctx.guild.id,
+            [other for other in compiled.words if other != word],
+            list(compiled.patterns),
+        )
+        await ctx.respond(f"`{word}` is no longer filtered")
+
+    @filter.command(description="Flag messages matching a regular expression without nested repeats.")
+    @commands.has_permissions(administrator=True)
+    @profiled("/filter add_pattern")
+    async def add_pattern(self, ctx, pattern: str):
+        """Add a regular expression to the filter"""
+        compiled = self.manager.get_filter(ctx.guild.id)
+        if pattern in compiled.patterns:
+            await ctx.respond(f"`{pattern}` is already filtered")
+            return
+        try:
+            if has_nested_repeat(pattern):
+                await ctx.respond(
+                    f"`{pattern}` repeats a repeated part, which can take too long"
+                    " to match"
+                )
+                return
+            self.manager.set_filter(
+                ctx.guild.id, list(compiled.words), [*compiled.patterns, pattern]
+            )
+        except re.error as error:
+            await ctx.respond(f"`{pattern}` is not a valid pattern: {error}")
+            return
+        await ctx.respond(f"`{pattern}` is now filtered")
+
+    @filter.command(description="Stop flagging messages matching a pattern.")
+    @commands.has_permissions(administrator=True)
+    @profiled("/filter remove_pattern")
+    async def remove_pattern(self, ctx, pattern: str):
+        """Remove a regular expression from the filter"""
+        compiled = self.manager.get_filter(ctx.guild.id)
+        if pattern not in compiled.patterns:
+            await ctx.respond(f"`{pattern}` isn't filtered")
+            return
+        self.manager.set_filter(
+            ctx.guild.id,
+            list(compiled.words),
+            [other for other in compiled.patterns if other != pattern],
+        )
+        await ctx.respond(f"`{pattern}` is no longer filtered")
+
+    @filter.command(name="list", description="Show the filtered words and patterns.")
+    @commands.has_permissions(administrator=True)
+    @profiled("/filter list")
+    async def show(self, ctx):
+        """List the filter contents"""
+        compiled = self.manager.get_filter(ctx.guild.id)
+        embed = discord.Embed(title="Filter")
+        embed.add_field(
+            name=f"Words ({len(compiled.words)})",
+            value=", ".join(f"`{word}`" for word in compiled.words)[:1024] or "None",
+            inline=False,
+        )
+        embed.add_field(
+            name=f"Patterns ({len(compiled.patterns)})",
+            value="\n".join(f"`{pattern}`" for pattern in compiled.patterns)[:1024]
+            or "None",
+            inline=False,
+        )
+        await ctx.respond(embed=embed, ephemeral=True)
+
+
+class FilterScanCog(ManagedCog):
+    """A class storing the keyword filter listener"""
+
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message):
+        """Flag a message into the cases channel if it matches the filter"""
+        if message.author.bot or message.guild is None or not message.content:
+            return
+        cases = self.manager.config.get_mod_cases(message.guild.id)
+        if cases is not None and cases in (
+            message.channel.id,
+            getattr(message.channel, "parent_id", None),
+        ):
+            # Flagged messages are quoted in the cases, don't flag them again
+            return
+        matches = self.manager.get_filter(message.guild.id).scan(message.content)
+        if matches:
+            await self.manager.flag_message(message, matches)
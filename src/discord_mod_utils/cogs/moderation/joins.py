@@ -0,0 +1,119 @@
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+
+import discord
+from discord.ext import commands
+
+from ...guards import is_mod
+from ...joins import JoinIndex
+from ...manager import ModerationManager
+from ...profiler import profiled
+from ...views import MemberActionsViewContainer
+from ..managed import ManagedCog
+
+
+class JoinIndexCog(ManagedCog):
+    """A class storing the member join index and the commands querying it"""
+
+    def __init__(self, manager: ModerationManager):
+        """Initialize the cog"""
+        super().__init__(manager)
+        self.indexes: dict[int, JoinIndex] = {}
+
+    def get_index(self, guild_id: int) -> JoinIndex:
+        """Get the join index of a guild"""
+        if guild_id not in self.indexes:
+            self.indexes[guild_id] = JoinIndex()
+        return self.indexes[guild_id]
+
+    @commands.Cog.listener()
+    async def on_guild_available(self, guild: discord.Guild):
+        """Fill the index with the members received in the member chunk"""
+        self.get_index(guild.id).add_members(
+            (member.id, member.joined_at.timestamp(), member.created_at.timestamp())
+            for member in guild.members
+            if member.joined_at
+        )
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member):
+        """Add a member that just joined to the index"""
+        if member.joined_at:
+            self.get_index(member.guild.id).add_member(
+                member.id, member.joined_at.timestamp(), member.created_at.timestamp()
+            )
+
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message):
+        """Record the first message of a recently joined member"""
+        if message.guild is not None:
+            self.get_index(message.guild.id).add_message(
+                message.author.id, message.created_at.timestamp()
+            )
+
+    @commands.slash_command(description="Find members who joined recently.")
+    @profiled("/joins")
+    async def joins(
+        self,
+        ctx,
+        minutes: discord.Option(  # type: ignore
+            float, description="How long ago the members joined", min_value=0
+        ),
+        account_age_days: discord.Option(  # type: ignore
+            float,
+            description="Only show accounts younger than this",
+            min_value=0,
+            required=False,
+        ) = None,
+        posted_within_minutes: discord.Option(  # type: ignore
+            float,
+            description="Only show members who posted this soon after joining",
+            min_value=0,
+            required=False,
+        ) = None,
+    ):
+        """Query the join index"""
+        member = await ctx.guild.fetch_member(ctx.user.id)
+        if not await is_mod(
+            member,
+            self.manager.config,
+            lambda response: ctx.respond(response, ephemeral=True),
+        ):
+            return
+        now = datetime.now(timezone.utc)
+        member_ids = self.get_index(ctx.guild.id).query(
+            joined_after=(now - timedelta(minutes=minutes)).timestamp(),
+            created_after=None
+            if account_age_days is None
+            else (now - timedelta(days=account_age_days)).timestamp(),
+            posted_within=None
+            if posted_within_minutes is None
+            else posted_within_minutes * 60,
+        )
+        members = [
+            found
+            for found in map(ctx.guild.get_member, member_ids)
+            if found is not None
+        ]
+        if not members:
+            await ctx.respond("No members match", ephemeral=True)
+            return
+        embed = discord.Embed(title=f"{len(members)} members")
+        embed.add_field(
+            name="Members",
+            value=", ".join(found.mention for found in members)[:1024],
+            inline=False,
+        )
+        embed.add_field(
+            name="IDs",
+            value=" ".join(str(found.id) for found in members)[:1024],
+            inline=False,
+        )
+        await ctx.respond(
+            embed=embed,
+            view=MemberActionsViewContainer(
+                members=members, config=self.manager.config
+            ).view,
+            ephemeral=True,
+        )
@@ -0,0 +1,27 @@
+import discord
+from discord.ext import commands
+
+from ...manager import ModerationManager
+from ...spam import SpamDetector
+from ..managed import ManagedCog
+
+
+class SpamDetectionCog(ManagedCog):
+    """A class storing the automatic spam detection listener"""
+
+    def __init__(self, manager: ModerationManager, detector: SpamDetector):
+        """Initialize the cog"""
+        super().__init__(manager)
+        self.detector = detector
+
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message):
+        """Open a case when a message completes a spam wave"""
+        if message.author.bot or message.guild is None:
+            return
+        messages = self.detector.add(message)
+        if messages:
+            accounts = {similar.author.id for similar in messages}
+            await self.manager.open_spam_case(
+                messages, by_accounts=len(accounts) >= self.detector.min_accounts
+            )
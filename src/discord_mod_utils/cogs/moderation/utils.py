@@ -2,6 +2,7 @@ import discord
 from discord.ext import commands
 
 from ...guards import is_mod
+from ...profiler import profiled
 from ...thread_modal import ModThreadCreationModal
 from ...views import UserActionsView
 from ..managed import ManagedCog
@@ -11,6 +12,7 @@ class UtilsCog(ManagedCog):
     """A class storing all message context commands"""
 
     @commands.message_command(name="Start a moderation thread")
+    @profiled("Start a moderation thread")
     async def start_mod_thread(self, ctx, message: discord.Message):
         """Start a moderation case thread for a message"""
         member = await ctx.guild.fetch_member(ctx.user.id)
@@ -37,6 +39,7 @@ class UtilsCog(ManagedCog):
             )
 
     @commands.message_command(name="Get message info")
+    @profiled("Get message info")
     async def get_message_info(self, ctx, message: discord.Message):
         """Get basic message info"""
         member = await ctx.guild.fetch_member(ctx.user.id)
@@ -51,6 +54,7 @@ class UtilsCog(ManagedCog):
             )
 
     @commands.message_command(name="Get user info")
+    @profiled("Get user info")
     async def get_user_info(self, ctx, message: discord.Message):
         """Get basic user info"""
         member = await ctx.guild.fetch_member(ctx.user.id)
@@ -10,6 +10,7 @@ class Config:
 
     database: Database
     token: str
+    export_dir: str = "exports"
 
     def get_mod_cases(self, guild_id: int) -> Optional[int]:
         """Get the ID of the channel used for storing mod cases"""
@@ -28,3 +29,11 @@ class Config:
         guild = self.database.get_guild(guild_id)
         guild.duplication_webhook = mod_hook_id
         self.database.set_guild(guild_id, guild)
+
+    def get_context_messages(self, guild_id: int) -> int:
+        """Get the number of preceding messages to capture into a case"""
+        return self.database.get_guild(guild_id).context_messages
+
+    def get_capture_reply_chain(self, guild_id: int) -> bool:
+        """Get whether to capture the reply chain of a reported message"""
+        return self.database.get_guild(guild_id).capture_reply_chain
@@ -1,6 +1,8 @@
 from abc import ABC
 from abc import abstractmethod
 from dataclasses import dataclass
+from dataclasses import field
+from typing import Any
 from typing import Optional
 
 
@@ -11,9 +13,13 @@ class Guild:
     moderator_role: Optional[int] = None
     cases_channel: Optional[int] = None
     duplication_webhook: Optional[int] = None
+    context_messages: int = 0
+    capture_reply_chain: bool = False
+    filter_words: list[str] = field(default_factory=list)
+    filter_patterns: list[str] = field(default_factory=list)
 
     @classmethod
-    def from_dict(cls, dictionary: Optional[dict[str, Optional[str]]]):
+    def from_dict(cls, dictionary: Optional[dict[str, Any]]) -> "Guild":
         """Create a config object from a dictionary representation"""
         if dictionary:
             return cls(
@@ -26,6 +32,16 @@ class Guild:
                 duplication_webhook=int(dictionary["duplication_webhook"])
                 if dictionary.get("duplication_webhook")
                 else None,
+                context_messages=int(dictionary["context_messages"])
+                if dictionary.get("context_messages")
+                else 0,
+                capture_reply_chain=dictionary.get("capture_reply_chain") == "true",
+                filter_words=dictionary["filter_words"].split("\n")
+                if dictionary.get("filter_words")
+                else [],
+                filter_patterns=dictionary["filter_patterns"].split("\n")
+                if dictionary.get("filter_patterns")
+                else [],
             )
         return cls()
 
@@ -37,6 +53,16 @@ class Guild:
             "duplication_webhook": str(self.duplication_webhook)
             if self.duplication_webhook
             else None,
+            "context_messages": str(self.context_messages)
+            if self.context_messages
+            else None,
+            "capture_reply_chain": "true" if self.capture_reply_chain else None,
+            "filter_words": "\n".join(self.filter_words)
+            if self.filter_words
+            else None,
+            "filter_patterns": "\n".join(self.filter_patterns)
+            if self.filter_patterns
+            else None,
         }
 
 
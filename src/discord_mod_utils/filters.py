@@ -0,0 +1,226 @@
+import re
+from collections import deque
+from typing import Any
+from typing import Iterable
+from typing import Optional
+
+try:
+    from re import _parser as sre_parse  # type: ignore[attr-defined]
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+# Anything that refers to a group by number or name, or defines a
+# named group, would break or change meaning once the group numbers
+# are shifted by combining the patterns
+_GROUP_REFERENCE = re.compile(r"\\[1-9]|\\g<|\(\?P[=<]|\(\?<[^=!]|\(\?\(")
+_DEFAULT_FLAGS = re.compile("").flags
+
+
+def can_combine(pattern: str) -> bool:
+    """Check whether a valid pattern keeps its meaning in a combined regex
+
+    Patterns referring to their groups or setting global inline flags
+    have to be matched on their own
+
+    """
+    return (
+        re.compile(pattern).flags == _DEFAULT_FLAGS
+        and _GROUP_REFERENCE.search(pattern) is None
+    )
+
+
+def _is_word_char(char: str) -> bool:
+    """Check whether a character can be a part of a word"""
+    return char.isalnum() or char == "_"
+
+
+def _has_nested_repeat(parsed: Any, repeated: bool = False) -> bool:
+    """Look for an unbounded repeat within a repeated part of a parsed pattern"""
+    for item in parsed:
+        if isinstance(item, sre_parse.SubPattern):
+            if _has_nested_repeat(item, repeated):
+                return True
+        elif isinstance(item, (tuple, list)):
+            if item and item[0] in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT):
+                _, maximum, subpattern = item[1]
+                unbounded = maximum == sre_parse.MAXREPEAT
+                if unbounded and repeated:
+                    return True
+                if _has_nested_repeat(subpattern, repeated or maximum > 1):
+                    return True
+            elif _has_nested_repeat(item, repeated):
+                return True
+    return False
+
+
+def has_nested_repeat(pattern: str) -> bool:
+    """Check whether a pattern repeats something that is itself repeated
+
+    Patterns like `(a+)+` can take exponential time to fail to match,
+    which would block the bot while scanning a single message
+
+    Raises:
+        re.error: if the pattern is invalid
+
+    """
+    return _has_nested_repeat(sre_parse.parse(pattern))
+
+
+class AhoCorasick:
+    """An automaton matching any number of literal terms in one pass
+
+    The time it takes to scan a text depends on the length of the text
+    and the number of matches, but not on the number of terms
+
+    """
+
+    def __init__(self, terms: Iterable[str]) -> None:
+        """Build the automaton
+
+        Args:
+            terms: the literal terms to match, matched case-insensitively
+
+        """
+        self.goto: list[dict[str, int]] = [{}]
+        self.fail: list[int] = [0]
+        self.output: list[list[str]] = [[]]
+        for term in terms:
+            self._add(term.lower())
+        self._link()
+
+    def _add(self, term: str) -> None:
+        """Add a term to the trie"""
+        if not term:
+            return
+        state = 0
+        for char in term:
+            if char not in self.goto[state]:
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+                self.goto[state][char] = len(self.goto) - 1
+            state = self.goto[state][char]
+        self.output[state].append(term)
+
+    def _link(self) -> None:
+        """Calculate the failure links breadth-first"""
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self.goto[state].items():
+                queue.append(child)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+
+    def find(self, text: str) -> set[str]:
+        """Get all of the terms that occur in a text as whole words
+
+        A term only matches if it isn't directly preceded or followed
+        by a word character, so "ass" doesn't match within "class"
+
+        """
+        found: set[str] = set()
+        goto = self.goto
+        fail = self.fail
+        output = self.output
+        text = text.lower()
+        state = 0
+        for end, char in enumerate(text, 1):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                for term in output[state]:
+                    start = end - len(term)
+                    if not (start > 0 and _is_word_char(text[start - 1])) and not (
+                        end < len(text) and _is_word_char(text[end])
+                    ):
+                        found.add(term)
+        return found
+
+
+class CompiledFilter:
+    """A guild's word list and patterns compiled for single-pass scanning"""
+
+    def __init__(self, words: Iterable[str], patterns: Iterable[str]) -> None:
+        """Compile the filter
+
+        Patterns that can be combined are joined into a single regex,
+        the rest (e.g. ones with backreferences) are matched one by one
+
+        Args:
+            words: literal terms, matched case-insensitively as whole words
+            patterns: regular expressions, matched case-insensitively
+
+        Raises:
+            re.error: if one of the patterns is invalid
+
+        """
+        self.words = tuple(words)
+        self.patterns = tuple(patterns)
+        self.automaton = AhoCorasick(self.words) if self.words else None
+        combined: list[str] = []
+        self.separate: list[re.Pattern[str]] = []
+        for pattern in self.patterns:
+            try:
+                if can_combine(pattern):
+                    combined.append(pattern)
+                else:
+                    self.separate.append(re.compile(pattern, re.IGNORECASE))
+            except re.error as error:
+                raise re.error(f"{error} in `{pattern}`") from error
+        self.regex: Optional[re.Pattern[str]] = (
+            re.compile(
+                "|".join(f"(?:{pattern})" for pattern in combined), re.IGNORECASE
+            )
+            if combined
+            else None
+        )
+
+    def scan(self, text: str) -> set[str]:
+        """Get everything in a text that matches the filter"""
+        matches: set[str] = set()
+        if self.automaton is not None:
+            matches |= self.automaton.find(text)
+        for regex in (self.regex, *self.separate):
+            if regex is not None:
+                matches.update(match.group(0) for match in regex.finditer(text))
+        return matches
+
+
+class FilterCache:
+    """Stores the compiled filters of every guild
+
+    A guild's filter is only recompiled when its lists change
+
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty cache"""
+        self.filters: dict[int, CompiledFilter] = {}
+
+    def get(self, guild_id: int) -> Optional[CompiledFilter]:
+        """Get the compiled filter of a guild, None if it wasn't loaded"""
+        return self.filters.get(guild_id)
+
+    def set(self, guild_id: int, compiled: CompiledFilter) -> None:
+        """Store an already compiled filter of a guild"""
+        self.filters[guild_id] = compiled
+
+    def update(
+        self, guild_id: int, words: Iterable[str], patterns: Iterable[str]
+    ) -> CompiledFilter:
+        """Recompile the filter of a guild if its lists have changed"""
+        words = tuple(words)
+        patterns = tuple(patterns)
+        compiled = self.filters.get(guild_id)
+        if compiled is None or (compiled.words, compiled.patterns) != (
+            words,
+            patterns,
+        ):
+            compiled = CompiledFilter(words, patterns)
+            self.filters[guild_id] = compiled
+        return compiled
@@ -0,0 +1,46 @@
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from functools import lru_cache
+
+import discord
+import humanize
+
+
+@lru_cache(maxsize=1024)
+def permissions_to_text(value: int) -> str:
+    """Convert a permission bitfield to a human-readable list
+
+    Members usually share a handful of distinct permission sets, so
+    the result is memoized by the raw permission value
+
+    """
+    return ", ".join(
+        perm.replace("_", " ").capitalize()
+        for perm, enabled in discord.Permissions(value)
+        if enabled
+    )
+
+
+@lru_cache(maxsize=4096)
+def _relative_to_text(days: int, seconds: int, future: bool) -> str:
+    """Humanize a delta given only the parts humanize actually reads
+
+    humanize only looks at the days and seconds of a delta, and stops
+    looking at the seconds once it's at least a day long, so the cache
+    key can't produce a different text than humanize itself would
+
+    """
+    delta = timedelta(days=days, seconds=seconds)
+    return str(humanize.naturaltime(-delta if future else delta))
+
+
+def datetime_to_text(time: datetime) -> str:
+    """Convert a datetime.datetime to a human-readable representation"""
+    now = datetime.now(timezone.utc)
+    delta = abs(now - time)
+    ago = _relative_to_text(
+        delta.days, delta.seconds if delta.days == 0 else 0, time > now
+    )
+    absolute = time.strftime("%H:%M:%S, %d %b, %Y")
+    return f"{ago}; {absolute}"
@@ -0,0 +1,152 @@
+import time
+from array import array
+from bisect import bisect_left
+from bisect import bisect_right
+from typing import Iterable
+from typing import Optional
+
+
+class SortedColumn:
+    """Member IDs kept in two compact arrays, sorted by a timestamp"""
+
+    def __init__(self) -> None:
+        """Initialize an empty column"""
+        self.keys = array("d")
+        self.ids = array("q")
+
+    def extend(self, rows: Iterable[tuple[float, int]]) -> None:
+        """Add many rows at once, sorting only once"""
+        merged = sorted([*zip(self.keys, self.ids), *rows])
+        self.keys = array("d", (key for key, _ in merged))
+        self.ids = array("q", (member_id for _, member_id in merged))
+
+    def insert(self, key: float, member_id: int) -> None:
+        """Add a single row; rows usually arrive in order, so it's cheap"""
+        position = bisect_right(self.keys, key)
+        self.keys.insert(position, key)
+        self.ids.insert(position, member_id)
+
+    def remove(self, key: float, member_id: int) -> None:
+        """Remove a single row, if it's there"""
+        position = bisect_left(self.keys, key)
+        while position < len(self.keys) and self.keys[position] == key:
+            if self.ids[position] == member_id:
+                del self.keys[position]
+                del self.ids[position]
+                return
+            position += 1
+
+    def between(self, start: float, end: float) -> list[int]:
+        """Get the IDs of the rows with start <= key <= end"""
+        return list(
+            self.ids[bisect_left(self.keys, start) : bisect_right(self.keys, end)]
+        )
+
+
+class JoinIndex:
+    """A time-ordered index of the member joins of a single guild
+
+    All timestamps are in seconds since the epoch
+
+    """
+
+    def __init__(self, started_at: Optional[float] = None) -> None:
+        """Initialize an empty index
+
+        Args:
+            started_at: when messages started being recorded, now by default
+
+        """
+        self.started_at = time.time() if started_at is None else started_at
+        self.joined = SortedColumn()
+        self.created = SortedColumn()
+        self.first_message_delays = SortedColumn()
+        self.joined_at: dict[int, float] = {}
+        self.first_message_delay: dict[int, float] = {}
+
+    def add_members(self, members: Iterable[tuple[int, float, float]]) -> None:
+        """Add a batch of members, e.g. from the gateway member chunk
+
+        Args:
+            members: (member ID, joined at, account created at) tuples
+
+        """
+        new = []
+        for member in members:
+            if member[0] in self.joined_at:
+                self.add_member(*member)
+            else:
+                new.append(member)
+        for member_id, joined_at, _ in new:
+            self.joined_at[member_id] = joined_at
+        self.joined.extend((joined_at, member_id) for member_id, joined_at, _ in new)
+        self.created.extend((created_at, member_id) for member_id, _, created_at in new)
+
+    def add_member(self, member_id: int, joined_at: float, created_at: float) -> None:
+        """Add a member that just joined
+
+        A member that rejoined is moved to their new join time and their
+        first message after rejoining is what counts
+
+        """
+        previous = self.joined_at.get(member_id)
+        if previous == joined_at:
+            return
+        if previous is not None:
+            self.joined.remove(previous, member_id)
+            self.created.remove(created_at, member_id)
+            if member_id in self.first_message_delay:
+                self.first_message_delays.remove(
+                    self.first_message_delay.pop(member_id), member_id
+                )
+        self.joined_at[member_id] = joined_at
+        self.joined.insert(joined_at, member_id)
+        self.created.insert(created_at, member_id)
+
+    def add_message(self, member_id: int, sent_at: float) -> None:
+        """Record the first message of a member, ignoring the later ones
+
+        Members who joined before the index was started are ignored, as
+        they could have posted before we were watching
+
+        """
+        if member_id in self.first_message_delay or member_id not in self.joined_at:
+            return
+        if self.joined_at[member_id] < self.started_at:
+            return
+        delay = sent_at - self.joined_at[member_id]
+        self.first_message_delay[member_id] = delay
+        self.first_message_delays.insert(delay, member_id)
+
+    def joined_between(self, start: float, end: float) -> list[int]:
+        """Get the members that joined within a time window"""
+        return self.joined.between(start, end)
+
+    def created_after(self, time: float) -> list[int]:
+        """Get the members whose accounts were created after a given time"""
+        return self.created.between(time, float("inf"))
+
+    def posted_within(self, seconds: float) -> list[int]:
+        """Get the members who posted within some time of joining"""
+        return self.first_message_delays.between(float("-inf"), seconds)
+
+    def query(
+        self,
+        joined_after: float,
+        created_after: Optional[float] = None,
+        posted_within: Optional[float] = None,
+    ) -> list[int]:
+        """Get the members matching all of the given conditions
+
+        Returns:
+            the member IDs, most recently joined first
+
+        """
+        result = self.joined_between(joined_after, float("inf"))
+        if created_after is not None:
+            young = set(self.created_after(created_after))
+            result = [member_id for member_id in result if member_id in young]
+        if posted_within is not None:
+            quick = set(self.posted_within(posted_within))
+            result = [member_id for member_id in result if member_id in quick]
+        return result[::-1]
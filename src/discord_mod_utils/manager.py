@@ -1,15 +1,40 @@
+import asyncio
+import logging
+import os
+import time
 from datetime import datetime
 from datetime import timedelta
 from datetime import timezone
+from typing import Any
 from typing import Optional
 from typing import Union
 
 import discord
-import humanize
 
 from .config import Config
+from .filters import CompiledFilter
+from .filters import FilterCache
+from .formatting import datetime_to_text
+from .formatting import permissions_to_text
+from .profiler import span
+from .transcript import WRITERS
 from .views import UserActionsView
 
+logger = logging.getLogger(__name__)
+
+NO_MENTIONS = discord.AllowedMentions(
+    everyone=False, users=False, roles=False, replied_user=False
+)
+# Webhooks are limited to 5 requests every 2 seconds
+WEBHOOK_SEND_INTERVAL = 0.4
+MAX_CONTENT_LENGTH = 2000
+MAX_EMBEDS = 10
+MAX_REPLY_CHAIN = 10
+UNKNOWN_WEBHOOK = 10015
+EXPORT_CONCURRENCY = 4
+# Only the first filter match of an author is flagged within that many seconds
+FLAG_COOLDOWN = 60.0
+
 
 class ModerationManager:
     """A class that actually manages all of the actions"""
@@ -17,12 +42,14 @@ class ModerationManager:
     def __init__(self, bot: discord.Bot, config: Config):
         self.bot = bot
         self.config = config
+        self.filters = FilterCache()
+        self.webhooks: dict[int, discord.Webhook] = {}
+        self.webhook_slots: dict[int, float] = {}
+        self.flagged: dict[tuple[int, int], float] = {}
 
     def datetime_to_text(self, time: datetime) -> str:
         """Convert a datetime.datetime to a human-readable representation"""
-        ago = humanize.naturaltime(time, when=datetime.now(timezone.utc))
-        absolute = time.strftime("%H:%M:%S, %d %b, %Y")
-        return f"{ago}; {absolute}"
+        return datetime_to_text(time)
 
     def form_message_info_embed(
         self, message: discord.Message, requested_by: discord.Member
@@ -81,20 +108,14 @@ class ModerationManager:
             if not short:
                 user_info.add_field(
                     name="Guild permissions",
-                    value=", ".join(
-                        perm.replace("_", " ").capitalize()
-                        for perm, value in member.guild_permissions
-                        if value
-                    ),
+                    value=permissions_to_text(member.guild_permissions.value),
                     inline=False,
                 )
                 if channel and isinstance(channel, discord.abc.GuildChannel):
                     user_info.add_field(
                         name="Original channel permissions",
-                        value=", ".join(
-                            perm.replace("_", " ").capitalize()
-                            for perm, value in channel.permissions_for(member)
-                            if value
+                        value=permissions_to_text(
+                            channel.permissions_for(member).value
                         ),
                         inline=False,
                     )
@@ -106,37 +127,182 @@ class ModerationManager:
             user_info.set_author(name=name)
         return user_info
 
-    async def duplicate_message_into_webhook(
-        self, message: discord.Message, thread: discord.Thread, member: discord.Member
-    ) -> None:
-        """Duplicates a message into a thread using a webhook"""
-        channel = thread.parent
-        if channel is None:
-            return
-        hook_id = self.config.get_mod_hook(channel.guild.id)
+    async def get_mod_webhook(
+        self, channel: discord.TextChannel
+    ) -> discord.Webhook:
+        """Get the duplication webhook of a channel, creating it if needed"""
+        with span("db.get_mod_hook"):
+            hook_id = self.config.get_mod_hook(channel.guild.id)
+        cached = self.webhooks.get(channel.id)
+        if cached is not None and cached.id == hook_id:
+            return cached
+        with span("rest.guild_webhooks"):
+            guild_webhooks = await channel.guild.webhooks()
         webhooks = [
             webhook
-            for webhook in await channel.guild.webhooks()
+            for webhook in guild_webhooks
             if webhook.channel_id == channel.id and webhook.id == hook_id
         ]
         if webhooks:
             webhook = webhooks[0]
         else:
-            webhook = await channel.create_webhook(
-                name="Moderation messages duplicator"
-            )
-            self.config.set_mod_hook(channel.guild.id, webhook.id)
-        await webhook.send(
+            with span("rest.create_webhook"):
+                webhook = await channel.create_webhook(
+                    name="Moderation messages duplicator"
+                )
+            with span("db.set_mod_hook"):
+                self.config.set_mod_hook(channel.guild.id, webhook.id)
+        self.webhooks[channel.id] = webhook
+        return webhook
+
+    async def duplicate_message_into_webhook(
+        self, message: discord.Message, thread: discord.Thread, member: discord.Member
+    ) -> None:
+        """Duplicates a message into a thread using a webhook"""
+        channel = thread.parent
+        if not isinstance(channel, discord.TextChannel):
+            return
+        await self.send_through_webhook(
+            channel,
             content=message.content,
             username=member.display_name,
             avatar_url=member.avatar and member.avatar.url,
             embeds=message.embeds,
-            allowed_mentions=discord.AllowedMentions(
-                everyone=False, users=False, roles=False, replied_user=False
-            ),
+            allowed_mentions=NO_MENTIONS,
             thread=thread,
         )
 
+    async def send_through_webhook(
+        self, channel: discord.TextChannel, **kwargs: Any
+    ) -> None:
+        """Send a message through the duplication webhook of a channel
+
+        Sends are paced under the webhook rate limit: every send
+        reserves the next free slot of its webhook before waiting, so
+        concurrent cases are paced together. If the cached webhook was
+        deleted, it is looked up or created again and the send retried
+
+        """
+        webhook = await self.get_mod_webhook(channel)
+        now = time.monotonic()
+        slot = max(now, self.webhook_slots.get(webhook.id, now))
+        self.webhook_slots[webhook.id] = slot + WEBHOOK_SEND_INTERVAL
+        if slot > now:
+            await asyncio.sleep(slot - now)
+        try:
+            with span("rest.webhook_send"):
+                await webhook.send(**kwargs)
+        except discord.NotFound as error:
+            if error.code != UNKNOWN_WEBHOOK:
+                raise
+            self.webhooks.pop(channel.id, None)
+            webhook = await self.get_mod_webhook(channel)
+            with span("rest.webhook_send"):
+                await webhook.send(**kwargs)
+
+    async def get_context(
+        self, message: discord.Message, limit: int, reply_chain: bool = False
+    ) -> list[discord.Message]:
+        """Get the conversation that led up to a message
+
+        The preceding messages are fetched with a single paged history
+        call; the reply chain is resolved from those messages and the
+        cache where possible, and only fetched as a last resort
+
+        Args:
+            message: the message to get the context of
+            limit: the number of preceding messages to get
+            reply_chain: whether to also follow the replies of the message
+
+        Returns:
+            the context messages, oldest first, without the message itself
+
+        """
+        context: dict[int, discord.Message] = {}
+        if limit > 0:
+            with span("rest.channel_history"):
+                async for previous in message.channel.history(
+                    limit=limit, before=message
+                ):
+                    context[previous.id] = previous
+        current = message
+        for _ in range(MAX_REPLY_CHAIN if reply_chain else 0):
+            reference = current.reference
+            if reference is None or reference.message_id is None:
+                break
+            if reference.message_id in context:
+                current = context[reference.message_id]
+                continue
+            if isinstance(reference.resolved, discord.Message):
+                current = reference.resolved
+            elif reference.cached_message is not None:
+                current = reference.cached_message
+            else:
+                try:
+                    with span("rest.fetch_message"):
+                        current = await message.channel.fetch_message(
+                            reference.message_id
+                        )
+                except discord.HTTPException:
+                    break
+            context[current.id] = current
+        context.pop(message.id, None)
+        return sorted(context.values(), key=lambda previous: previous.id)
+
+    def group_messages(
+        self, messages: list[discord.Message]
+    ) -> list[list[discord.Message]]:
+        """Group consecutive messages by author so that each fits one send"""
+        groups: list[list[discord.Message]] = []
+        length = 0
+        embeds = 0
+        for message in messages:
+            if (
+                groups
+                and groups[-1][-1].author.id == message.author.id
+                and length + len(message.content) + 1 <= MAX_CONTENT_LENGTH
+                and embeds + len(message.embeds) <= MAX_EMBEDS
+            ):
+                groups[-1].append(message)
+                length += len(message.content) + 1
+                embeds += len(message.embeds)
+            else:
+                groups.append([message])
+                length = len(message.content)
+                embeds = len(message.embeds)
+        return groups
+
+    async def duplicate_context_into_webhook(
+        self, messages: list[discord.Message], thread: discord.Thread
+    ) -> None:
+        """Duplicates the conversation into a thread using a webhook
+
+        Consecutive messages of the same author are merged into a
+        single send, and the sends are paced to stay under the webhook
+        rate limit
+
+        """
+        channel = thread.parent
+        if not isinstance(channel, discord.TextChannel) or not messages:
+            return
+        for group in self.group_messages(messages):
+            author = group[0].author
+            content = "\n".join(
+                message.content for message in group if message.content
+            )[:MAX_CONTENT_LENGTH]
+            embeds = [embed for message in group for embed in message.embeds]
+            if not content and not embeds:
+                continue  # nothing we can replicate, e.g. only attachments
+            await self.send_through_webhook(
+                channel,
+                content=content,
+                username=author.display_name,
+                avatar_url=author.avatar and author.avatar.url,
+                embeds=embeds,
+                allowed_mentions=NO_MENTIONS,
+                thread=thread,
+            )
+
     async def get_active_mods(self, message: discord.Message) -> list[discord.Member]:
         """Given a message, get list of mods who were participating
 
@@ -161,11 +327,12 @@ class ModerationManager:
                 continue  # so that mypy shuts up
             if message.author.id in analyzed:
                 continue  # don't wanna refetch a member
-            author = await message.guild.fetch_member(message.author.id)
+            with span("rest.fetch_member"):
+                author = await message.guild.fetch_member(message.author.id)
             analyzed.append(message.author.id)
-            if self.config.get_mod_role(message.guild.id) in [
-                role.id for role in author.roles
-            ]:
+            with span("db.get_mod_role"):
+                mod_role = self.config.get_mod_role(message.guild.id)
+            if mod_role in [role.id for role in author.roles]:
                 active_mods.append(author)
         return active_mods
 
@@ -184,11 +351,14 @@ class ModerationManager:
             the created thread otherwise
 
         """
-        cases_channel = await self.bot.fetch_channel(channel_id)
+        with span("rest.fetch_channel"):
+            cases_channel = await self.bot.fetch_channel(channel_id)
         if not isinstance(cases_channel, discord.TextChannel):
             return None
-        message: discord.Message = await cases_channel.send(description)
-        thread: discord.Thread = await message.create_thread(name=title)
+        with span("rest.send_description"):
+            message: discord.Message = await cases_channel.send(description)
+        with span("rest.create_thread"):
+            thread: discord.Thread = await message.create_thread(name=title)
         return thread
 
     async def populate_thread(
@@ -201,7 +371,8 @@ class ModerationManager:
         """Populate the mod case thread
 
         Sends the message and user info and replicates the original
-        message with a webhook
+        message, along with the configured amount of the conversation
+        that preceded it, with a webhook
 
         Args:
             thread: the thread to post to
@@ -210,11 +381,241 @@ class ModerationManager:
             message: the reported message
 
         """
-        await thread.send(
-            embed=self.form_message_info_embed(message, requester),
-            view=UserActionsView(member=member, config=self.config),
+        with span("rest.send_message_info"):
+            await thread.send(
+                embed=self.form_message_info_embed(message, requester),
+                view=UserActionsView(member=member, config=self.config),
+            )
+        if message.guild is not None:
+            with span("db.get_context_settings"):
+                limit = self.config.get_context_messages(message.guild.id)
+                reply_chain = self.config.get_capture_reply_chain(message.guild.id)
+            if limit or reply_chain:
+                context = await self.get_context(message, limit, reply_chain)
+                with span("duplicate_context_into_webhook"):
+                    await self.duplicate_context_into_webhook(context, thread)
+        with span("duplicate_message_into_webhook"):
+            await self.duplicate_message_into_webhook(message, thread, member)
+        with span("rest.send_user_info"):
+            await thread.send(
+                embed=self.form_user_info_embed(member, message.channel, True)
+            )
+
+    async def open_spam_case(
+        self, messages: list[discord.Message], by_accounts: bool = True
+    ) -> Optional[discord.Thread]:
+        """Open a moderation case for a wave of near-identical messages
+
+        Args:
+            messages: the similar messages, oldest first
+            by_accounts: whether the wave was detected by the number of
+                accounts rather than the number of channels
+
+        Returns:
+            None if there's no cases channel to open the case in
+            the created thread otherwise
+
+        """
+        message = messages[-1]
+        if message.guild is None:
+            return None
+        channel_id = self.config.get_mod_cases(message.guild.id)
+        if channel_id is None:
+            return None
+        accounts = {similar.author.id: similar.author for similar in messages}
+        channels = {similar.channel.id: similar.channel for similar in messages}
+        if by_accounts:
+            title = f"Spam from {len(accounts)} account" + (
+                "s" if len(accounts) != 1 else ""
+            )
+        else:
+            title = f"Spam in {len(channels)} channel" + (
+                "s" if len(channels) != 1 else ""
+            )
+        thread = await self.create_thread(
+            title=title,
+            description="Detected the same message being sent by "
+            + ", ".join(author.mention for author in accounts.values())
+            + " in "
+            + ", ".join(
+                getattr(channel, "mention", str(channel.id))
+                for channel in channels.values()
+            ),
+            channel_id=channel_id,
+        )
+        if thread is None:
+            return None
+        if isinstance(message.author, discord.Member):
+            member = message.author
+        else:
+            member = await message.guild.fetch_member(message.author.id)
+        await self.populate_thread(thread, self.bot.user, member, message)
+        return thread
+
+    def get_filter(self, guild_id: int) -> CompiledFilter:
+        """Get the compiled keyword filter of a guild
+
+        The filter is loaded from the database the first time it is
+        needed and only recompiled when it's changed with `set_filter`
+
+        """
+        compiled = self.filters.get(guild_id)
+        if compiled is None:
+            with span("db.get_guild"):
+                guild = self.config.database.get_guild(guild_id)
+            compiled = self.filters.update(
+                guild_id, guild.filter_words, guild.filter_patterns
+            )
+        return compiled
+
+    def set_filter(
+        self, guild_id: int, words: list[str], patterns: list[str]
+    ) -> CompiledFilter:
+        """Save and recompile the keyword filter of a guild
+
+        Raises:
+            re.error: if one of the patterns is invalid
+
+        """
+        compiled = CompiledFilter(words, patterns)
+        guild = self.config.database.get_guild(guild_id)
+        guild.filter_words = words
+        guild.filter_patterns = patterns
+        self.config.database.set_guild(guild_id, guild)
+        self.filters.set(guild_id, compiled)
+        return compiled
+
+    async def flag_message(self, message: discord.Message, matches: set[str]) -> None:
+        """Report a message that matched the keyword filter to the cases channel
+
+        Repeated matches of the same author within FLAG_COOLDOWN seconds
+        are not flagged again, so that a single user repeating a
+        filtered word can't flood the cases channel
+
+        """
+        if message.guild is None:
+            return
+        now = time.monotonic()
+        key = (message.guild.id, message.author.id)
+        if now - self.flagged.get(key, -FLAG_COOLDOWN) < FLAG_COOLDOWN:
+            return
+        if len(self.flagged) > 1000:
+            self.flagged = {
+                flagged: at
+                for flagged, at in self.flagged.items()
+                if now - at < FLAG_COOLDOWN
+            }
+        self.flagged[key] = now
+        channel_id = self.config.get_mod_cases(message.guild.id)
+        if channel_id is None:
+            return
+        cases_channel = self.bot.get_channel(channel_id)
+        if not isinstance(cases_channel, discord.TextChannel):
+            return
+        embed = discord.Embed(title="Filter match")
+        embed.add_field(name="Author", value=message.author.mention, inline=True)
+        embed.add_field(
+            name="Message", value=f"[link]({message.jump_url})", inline=True
         )
-        await self.duplicate_message_into_webhook(message, thread, member)
-        await thread.send(
-            embed=self.form_user_info_embed(member, message.channel, True)
+        embed.add_field(
+            name="Matched",
+            value=", ".join(f"`{match}`" for match in sorted(matches))[:1024],
+            inline=False,
+        )
+        embed.set_footer(
+            text=f"Further matches by this author in the next {FLAG_COOLDOWN:.0f}"
+            + " seconds won't be flagged"
         )
+        with span("rest.send_filter_match"):
+            if isinstance(message.author, discord.Member):
+                await cases_channel.send(
+                    embed=embed,
+                    view=UserActionsView(member=message.author, config=self.config),
+                )
+            else:
+                await cases_channel.send(embed=embed)
+
+    async def export_thread(
+        self, thread: discord.Thread, format: str, directory: Optional[str] = None
+    ) -> str:
+        """Export a case thread transcript to a file
+
+        The messages are streamed from the thread history and written
+        as they arrive, so long threads don't have to fit in memory
+
+        Args:
+            thread: the case thread to export
+            format: the transcript format, one of transcript.WRITERS
+            directory: where to save the file, config.export_dir by default
+
+        Returns:
+            the path of the written transcript
+
+        """
+        writer_class = WRITERS[format]
+        directory = directory or self.config.export_dir
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{thread.id}.{writer_class.extension}")
+        with open(path, "w", encoding="utf-8") as stream:
+            writer = writer_class(stream)
+            writer.begin(thread)
+            if isinstance(thread.parent, discord.TextChannel):
+                try:
+                    with span("rest.fetch_starter_message"):
+                        starter = await thread.parent.fetch_message(thread.id)
+                    writer.write(starter)
+                except discord.HTTPException:
+                    pass  # the case description was deleted
+            with span("rest.thread_history"):
+                async for message in thread.history(limit=None, oldest_first=True):
+                    writer.write(message)
+            writer.end()
+        return path
+
+    async def export_cases(
+        self,
+        channel_id: int,
+        format: str,
+        directory: Optional[str] = None,
+        concurrency: int = EXPORT_CONCURRENCY,
+    ) -> int:
+        """Export all case threads of a cases channel
+
+        Both active and archived threads are exported, with at most
+        `concurrency` threads being streamed at a time
+
+        Returns:
+            the number of exported threads
+
+        """
+        cases_channel = await self.bot.fetch_channel(channel_id)
+        if not isinstance(cases_channel, discord.TextChannel):
+            return 0
+        queue: asyncio.Queue[Optional[discord.Thread]] = asyncio.Queue(concurrency)
+        exported = 0
+
+        async def worker() -> None:
+            nonlocal exported
+            while (thread := await queue.get()) is not None:
+                try:
+                    await self.export_thread(thread, format, directory)
+                except Exception:
+                    # Keep the worker alive, otherwise the producer
+                    # would block forever on the bounded queue
+                    logger.exception("Failed to export thread %s", thread.id)
+                    continue
+                exported += 1
+
+        workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+        try:
+            for thread in cases_channel.threads:
+                await queue.put(thread)
+            async for thread in cases_channel.archived_threads(limit=None):
+                await queue.put(thread)
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+        return exported
@@ -0,0 +1,167 @@
+import functools
+import json
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from dataclasses import field
+from logging.handlers import RotatingFileHandler
+from typing import Any
+from typing import Callable
+from typing import Coroutine
+from typing import Iterator
+from typing import Optional
+from typing import TypeVar
+
+
+@dataclass
+class Span:
+    """A single timed call recorded inside an interaction"""
+
+    name: str
+    depth: int
+    start: float
+    duration: Optional[float] = None
+
+
+@dataclass
+class Trace:
+    """All of the spans recorded while handling a single interaction"""
+
+    name: str
+    start: float = field(default_factory=time.perf_counter)
+    spans: list[Span] = field(default_factory=list)
+
+    def to_dict(self, duration: float) -> dict[str, Any]:
+        """Generate a dictionary representation of the trace"""
+        return {
+            "interaction": self.name,
+            "duration_ms": round(duration * 1000, 3),
+            "spans": [
+                {
+                    "name": span.name,
+                    "depth": span.depth,
+                    "offset_ms": round((span.start - self.start) * 1000, 3),
+                    "duration_ms": None
+                    if span.duration is None
+                    else round(span.duration * 1000, 3),
+                }
+                for span in self.spans
+            ],
+        }
+
+
+class InteractionProfiler:
+    """Records traces of slow interactions into a rotating file
+
+    Only a sampled fraction of the interactions is traced; the rest
+    only pay for a single context variable lookup per span
+
+    """
+
+    def __init__(
+        self,
+        path: str = "slow_interactions.jsonl",
+        threshold: float = 1.0,
+        sample_rate: float = 0.1,
+        max_bytes: int = 5 * 1024 * 1024,
+        backup_count: int = 3,
+    ) -> None:
+        """Initialize the profiler
+
+        Args:
+            path: the file to dump slow interaction traces to
+            threshold: the duration (in seconds) above which a trace is dumped
+            sample_rate: the fraction of the interactions to trace
+            max_bytes: the size at which the dump file is rotated
+            backup_count: how many rotated dump files to keep
+
+        """
+        self.threshold = threshold
+        self.sample_rate = sample_rate
+        self.logger = logging.getLogger(f"{__name__}.{path}")
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+        self.logger.addHandler(
+            RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count)
+        )
+
+    @contextmanager
+    def interaction(self, name: str) -> Iterator[None]:
+        """Trace the interaction handled within the block, if sampled"""
+        if _current_trace.get() is not None or random.random() >= self.sample_rate:
+            yield
+            return
+        trace = Trace(name=name)
+        token = _current_trace.set(trace)
+        depth_token = _current_depth.set(0)
+        try:
+            yield
+        finally:
+            _current_depth.reset(depth_token)
+            _current_trace.reset(token)
+            duration = time.perf_counter() - trace.start
+            if duration >= self.threshold:
+                self.logger.info(json.dumps(trace.to_dict(duration)))
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("_current_trace", default=None)
+# The nesting depth is kept per context rather than on the trace, so
+# that tasks spawned within an interaction nest their spans separately
+_current_depth: ContextVar[int] = ContextVar("_current_depth", default=0)
+_profiler: Optional[InteractionProfiler] = None
+
+T = TypeVar("T")
+
+
+def enable_profiling(profiler: InteractionProfiler) -> None:
+    """Start tracing all of the interactions wrapped with `profiled`"""
+    global _profiler
+    _profiler = profiler
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Record the time spent within the block into the current trace
+
+    Works for both plain and awaited calls, as the trace is stored
+    in a context variable and so is separate for every asyncio task
+
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    depth = _current_depth.get()
+    recorded = Span(name=name, depth=depth, start=time.perf_counter())
+    trace.spans.append(recorded)
+    token = _current_depth.set(depth + 1)
+    try:
+        yield
+    finally:
+        _current_depth.reset(token)
+        recorded.duration = time.perf_counter() - recorded.start
+
+
+def profiled(
+    name: str,
+) -> Callable[
+    [Callable[..., Coroutine[Any, Any, T]]], Callable[..., Coroutine[Any, Any, T]]
+]:
+    """Trace a command or a view callback when profiling is enabled"""
+
+    def decorator(
+        callback: Callable[..., Coroutine[Any, Any, T]]
+    ) -> Callable[..., Coroutine[Any, Any, T]]:
+        @functools.wraps(callback)
+        async def wrapper(*args, **kwargs) -> T:
+            if _profiler is None:
+                return await callback(*args, **kwargs)
+            with _profiler.interaction(name):
+                return await callback(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,173 @@
+import re
+import time
+from collections import deque
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Optional
+
+import discord
+
+FINGERPRINT_BITS = 64
+BANDS = 8
+BAND_BITS = FINGERPRINT_BITS // BANDS
+SHINGLE_SIZE = 4
+# Only the start of a message is fingerprinted to bound the per-message cost
+MAX_FINGERPRINTED_LENGTH = 256
+
+_whitespace = re.compile(r"\s+")
+
+
+def fingerprint(text: str) -> int:
+    """Calculate the SimHash of a text's character shingles
+
+    Texts that differ only slightly get fingerprints that differ in
+    only a few bits
+
+    """
+    text = _whitespace.sub(" ", text.lower()).strip()[:MAX_FINGERPRINTED_LENGTH]
+    mask = (1 << FINGERPRINT_BITS) - 1
+    shingles = {
+        text[start : start + SHINGLE_SIZE]
+        for start in range(max(len(text) - SHINGLE_SIZE + 1, 1))
+    }
+    # Count the set bits column by column instead of bit by bit
+    rows = [f"{hash(shingle) & mask:0{FINGERPRINT_BITS}b}" for shingle in shingles]
+    result = 0
+    for column in zip(*rows):
+        result = result << 1 | (column.count("1") * 2 > len(rows))
+    return result
+
+
+def bands(fingerprint: int) -> list[tuple[int, int]]:
+    """Split a fingerprint into the keys used for indexing it
+
+    Two fingerprints that differ in less than BANDS bits are guaranteed
+    to share at least one band
+
+    """
+    mask = (1 << BAND_BITS) - 1
+    return [(band, fingerprint >> (band * BAND_BITS) & mask) for band in range(BANDS)]
+
+
+@dataclass
+class Entry:
+    """A fingerprinted message in the sliding window"""
+
+    time: float
+    fingerprint: int
+    message: discord.Message
+
+
+@dataclass
+class Wave:
+    """A spam wave that was already reported"""
+
+    fingerprint: int
+    last_seen: float
+
+
+@dataclass
+class GuildIndex:
+    """The sliding window of recent messages of a single guild"""
+
+    entries: deque[Entry] = field(default_factory=deque)
+    buckets: dict[tuple[int, int], deque[Entry]] = field(default_factory=dict)
+    waves: list[Wave] = field(default_factory=list)
+
+
+class SpamDetector:
+    """Detects the same message being spammed by many accounts or channels
+
+    Every message is fingerprinted once and looked up in a constant
+    number of size-capped buckets and compared against the few waves
+    still active, and every message is evicted from the window exactly
+    once, so the cost per message is O(1) amortized
+
+    """
+
+    def __init__(
+        self,
+        window: float = 10.0,
+        min_accounts: int = 3,
+        min_channels: int = 3,
+        max_distance: int = BANDS - 1,
+        min_length: int = 10,
+        max_bucket_size: int = 50,
+    ) -> None:
+        """Initialize the detector
+
+        Args:
+            window: for how many seconds messages are remembered
+            min_accounts: how many accounts have to post the content
+            min_channels: how many channels the content has to be posted in
+            max_distance: the max number of differing fingerprint bits
+            min_length: shorter messages are ignored
+            max_bucket_size: how many messages to compare against per band
+
+        """
+        self.window = window
+        self.min_accounts = min_accounts
+        self.min_channels = min_channels
+        self.max_distance = max_distance
+        self.min_length = min_length
+        self.max_bucket_size = max_bucket_size
+        self.guilds: dict[int, GuildIndex] = {}
+
+    def evict(self, index: GuildIndex, now: float) -> None:
+        """Forget the messages that have left the window"""
+        while index.entries and index.entries[0].time < now - self.window:
+            entry = index.entries.popleft()
+            for key in bands(entry.fingerprint):
+                bucket = index.buckets.get(key)
+                if bucket and bucket[0] is entry:
+                    bucket.popleft()
+                    if not bucket:
+                        del index.buckets[key]
+        index.waves = [
+            wave for wave in index.waves if wave.last_seen >= now - self.window
+        ]
+
+    def similar(self, first: int, second: int) -> bool:
+        """Check whether two fingerprints are close enough"""
+        return bin(first ^ second).count("1") <= self.max_distance
+
+    def add(self, message: discord.Message) -> Optional[list[discord.Message]]:
+        """Index a message
+
+        Returns:
+            the messages forming a spam wave if this message completes
+            one that wasn't reported yet, None otherwise
+
+        """
+        if message.guild is None or len(message.content) < self.min_length:
+            return None
+        now = time.monotonic()
+        index = self.guilds.get(message.guild.id)
+        if index is None:
+            index = self.guilds[message.guild.id] = GuildIndex()
+        self.evict(index, now)
+        entry = Entry(
+            time=now, fingerprint=fingerprint(message.content), message=message
+        )
+        keys = bands(entry.fingerprint)
+        similar: dict[int, discord.Message] = {message.id: message}
+        for key in keys:
+            for other in index.buckets.get(key, ()):
+                if self.similar(other.fingerprint, entry.fingerprint):
+                    similar[other.message.id] = other.message
+        index.entries.append(entry)
+        for key in keys:
+            bucket = index.buckets.setdefault(key, deque())
+            if len(bucket) < self.max_bucket_size:
+                bucket.append(entry)
+        for wave in index.waves:
+            if self.similar(wave.fingerprint, entry.fingerprint):
+                # Still the same wave, keep it from being reported again
+                wave.last_seen = now
+                return None
+        accounts = {similar_message.author.id for similar_message in similar.values()}
+        channels = {similar_message.channel.id for similar_message in similar.values()}
+        if len(accounts) < self.min_accounts and len(channels) < self.min_channels:
+            return None
+        index.waves.append(Wave(fingerprint=entry.fingerprint, last_seen=now))
+        return sorted(similar.values(), key=lambda similar_message: similar_message.id)
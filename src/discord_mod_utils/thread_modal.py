@@ -1,6 +1,7 @@
 import discord
 
 from .manager import ModerationManager
+from .profiler import profiled
 from .views import ModInviteViewContainer
 
 
@@ -47,6 +48,7 @@ class ModThreadCreationModal(discord.ui.Modal):
             return self.children[1].value
         return self.__title
 
+    @profiled("Create a moderation thread")
     async def callback(self, interaction: discord.Interaction):
         """Create a moderation thread"""
         response = await interaction.response.send_message(
@@ -0,0 +1,132 @@
+import html
+import json
+from abc import ABC
+from abc import abstractmethod
+from typing import Any
+from typing import TextIO
+
+import discord
+
+
+def message_to_dict(message: discord.Message) -> dict[str, Any]:
+    """Generate a dictionary representation of a case thread message"""
+    return {
+        "id": str(message.id),
+        "author_id": str(message.author.id),
+        "author": message.author.display_name,
+        "duplicated": message.webhook_id is not None,
+        "created_at": message.created_at.isoformat(),
+        "edited_at": message.edited_at.isoformat() if message.edited_at else None,
+        "content": message.content,
+        "embeds": [embed.to_dict() for embed in message.embeds],
+        "attachments": [attachment.url for attachment in message.attachments],
+    }
+
+
+class TranscriptWriter(ABC):
+    """Writes a case thread transcript message by message"""
+
+    extension: str
+
+    def __init__(self, stream: TextIO) -> None:
+        """Initialize the writer
+
+        Args:
+            stream: the text stream to write the transcript to
+
+        """
+        self.stream = stream
+
+    def begin(self, thread: discord.Thread) -> None:
+        """Write whatever precedes the messages"""
+        pass
+
+    @abstractmethod
+    def write(self, message: discord.Message) -> None:
+        """Write a single message"""
+        pass
+
+    def end(self) -> None:
+        """Write whatever follows the messages"""
+        pass
+
+
+class JSONLTranscriptWriter(TranscriptWriter):
+    """Writes a transcript as one JSON object per line"""
+
+    extension = "jsonl"
+
+    def begin(self, thread: discord.Thread) -> None:
+        """Write the thread header line"""
+        self.stream.write(
+            json.dumps(
+                {
+                    "thread_id": str(thread.id),
+                    "name": thread.name,
+                    "created_at": thread.created_at.isoformat()
+                    if thread.created_at
+                    else None,
+                }
+            )
+            + "\n"
+        )
+
+    def write(self, message: discord.Message) -> None:
+        """Write a single message as a JSON line"""
+        self.stream.write(json.dumps(message_to_dict(message)) + "\n")
+
+
+class HTMLTranscriptWriter(TranscriptWriter):
+    """Writes a transcript as a static HTML page"""
+
+    extension = "html"
+
+    def begin(self, thread: discord.Thread) -> None:
+        """Write the document head"""
+        title = html.escape(thread.name)
+        self.stream.write(
+            "<!DOCTYPE html>\n<html><head><meta charset='utf-8'>"
+            f"<title>{title}</title></head><body><h1>{title}</h1>\n"
+        )
+
+    def write(self, message: discord.Message) -> None:
+        """Write a single message as an HTML block"""
+        data = message_to_dict(message)
+        parts = [
+            "<div class='message'>",
+            f"<b>{html.escape(data['author'])}</b>",
+            " <i>(duplicated)</i>" if data["duplicated"] else "",
+            f" <small>{html.escape(data['created_at'])}</small>",
+            f"<p>{html.escape(data['content'])}</p>" if data["content"] else "",
+        ]
+        for embed in data["embeds"]:
+            parts.append("<div class='embed'>")
+            if embed.get("author", {}).get("name"):
+                parts.append(f"<p><i>{html.escape(embed['author']['name'])}</i></p>")
+            if embed.get("title"):
+                parts.append(f"<b>{html.escape(embed['title'])}</b>")
+            if embed.get("description"):
+                parts.append(f"<p>{html.escape(embed['description'])}</p>")
+            for embed_field in embed.get("fields", []):
+                parts.append(
+                    f"<p><b>{html.escape(embed_field['name'])}</b>: "
+                    f"{html.escape(embed_field['value'])}</p>"
+                )
+            if embed.get("footer", {}).get("text"):
+                parts.append(f"<small>{html.escape(embed['footer']['text'])}</small>")
+            parts.append("</div>")
+        for url in data["attachments"]:
+            parts.append(f"<a href='{html.escape(url)}'>{html.escape(url)}</a>")
+        parts.append("</div>\n")
+        self.stream.write("".join(parts))
+
+    def end(self) -> None:
+        """Close the document"""
+        self.stream.write("</body></html>\n")
+
+
+WRITERS: dict[str, type[TranscriptWriter]] = {
+    "jsonl": JSONLTranscriptWriter,
+    "html": HTMLTranscriptWriter,
+}
+
@@ -4,6 +4,7 @@ import discord
 
 from .config import Config
 from .guards import is_mod
+from .profiler import profiled
 
 
 class ModInviteViewContainer:
@@ -45,6 +46,7 @@ class ModInviteViewContainer:
             self.select.callback = self.select_mod
             self.view.add_item(self.select)
 
+    @profiled("Invite a mod")
     async def select_mod(self, interaction) -> None:
         """Select the moderator and invite them to the thread
 
@@ -59,6 +61,56 @@ class ModInviteViewContainer:
         )
 
 
+class MemberActionsViewContainer:
+    """Responsible for creating the view with a select for acting on a member"""
+
+    def __init__(self, members: list[discord.Member], config: Config) -> None:
+        """Create a view for selecting a member
+
+        Args:
+            members: the members to let the user choose from (up to 25)
+            config: the configuration used for checking moderator permissions
+
+        """
+        self.members = {str(member.id): member for member in members[:25]}
+        self.config = config
+        self.create_view()
+
+    def create_view(self) -> None:
+        """Initialize the view with a select in it"""
+        self.view = discord.ui.View()
+        self.create_select()
+
+    def create_select(self) -> None:
+        """Initialize the select and add it to the view"""
+        if self.members:
+            self.select: discord.ui.Select = discord.ui.Select(
+                placeholder="Choose a member to moderate",
+                min_values=1,
+                max_values=1,
+                options=[
+                    discord.SelectOption(
+                        label=member.display_name,
+                        description=f"{member.name}#{member.discriminator}",
+                        value=member_id,
+                    )
+                    for member_id, member in self.members.items()
+                ],
+            )
+            self.select.callback = self.select_member
+            self.view.add_item(self.select)
+
+    @profiled("Choose a member to moderate")
+    async def select_member(self, interaction) -> None:
+        """Show the moderation actions for the selected member"""
+        member = self.members[self.select.values[0]]
+        await interaction.response.send_message(
+            f"Actions for {member.mention}",
+            view=UserActionsView(member=member, config=self.config),
+            ephemeral=True,
+        )
+
+
 class UserActionsView(discord.ui.View):
     """A view containing a set of buttons for quick user moderation"""
 
@@ -69,6 +121,7 @@ class UserActionsView(discord.ui.View):
         super().__init__(*args, **kwargs)
 
     @discord.ui.button(label="Timeout 1m", style=discord.ButtonStyle.primary, row=0)
+    @profiled("UserActionsView.timeout_1m")
     async def timeout_1m(self, button, interaction: discord.Interaction) -> None:
         """Timeout the user for one minute"""
         if not isinstance(interaction.user, discord.Member):
@@ -89,6 +142,7 @@ class UserActionsView(discord.ui.View):
             )
 
     @discord.ui.button(label="Timeout 1h", style=discord.ButtonStyle.primary, row=0)
+    @profiled("UserActionsView.timeout_1h")
     async def timeout_1h(self, button, interaction: discord.Interaction) -> None:
         """Timeout the user for one hour"""
         if not isinstance(interaction.user, discord.Member):
@@ -109,6 +163,7 @@ class UserActionsView(discord.ui.View):
             )
 
     @discord.ui.button(label="Timeout 1d", style=discord.ButtonStyle.primary, row=0)
+    @profiled("UserActionsView.timeout_1d")
     async def timeout_1d(self, button, interaction: discord.Interaction) -> None:
         """Timeout the user for one day"""
         if not isinstance(interaction.user, discord.Member):
@@ -129,6 +184,7 @@ class UserActionsView(discord.ui.View):
             )
 
     @discord.ui.button(label="Kick", style=discord.ButtonStyle.red, row=1)
+    @profiled("UserActionsView.kick")
     async def kick(self, button, interaction: discord.Interaction) -> None:
         """Kick the user"""
         if not isinstance(interaction.user, discord.Member):
@@ -151,6 +207,7 @@ class UserActionsView(discord.ui.View):
         style=discord.ButtonStyle.red,
         row=1,
     )
+    @profiled("UserActionsView.ban")
     async def ban(self, button, interaction: discord.Interaction) -> None:
         """Ban the user"""
         if not isinstance(interaction.user, discord.Member):